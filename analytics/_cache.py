@@ -0,0 +1,112 @@
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from sqlalchemy import text
+
+# Newest write per activity table; any new row invalidates cached results.
+# Each MAX is an index lookup via the idx_*_time indexes from setup_database
+_WATERMARK_QUERY = text("""
+    SELECT
+        (SELECT MAX(post_time) FROM posts) AS last_post,
+        (SELECT MAX(comment_time) FROM comments) AS last_comment,
+        (SELECT MAX(like_time) FROM likes) AS last_like,
+        (SELECT MAX(follow_time) FROM follows) AS last_follow
+""")
+
+_MISSING = object()
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or _MISSING if absent or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        """Store value under key for ttl seconds, dropping expired and then the oldest entries"""
+        with self._lock:
+            now = time.monotonic()
+            expired = [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]
+            for k in expired:
+                del self._entries[k]
+            
+            self._entries[key] = (now + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+query_cache = QueryCache()
+
+def data_watermark(session) -> tuple:
+    """Latest post/comment/like/follow timestamps, used to invalidate cached results"""
+    return tuple(session.execute(_WATERMARK_QUERY).one())
+
+def cached(
+    ttl: float = 300,
+    key: Optional[Callable[..., Hashable]] = None,
+    cache: Optional[QueryCache] = None
+) -> Callable:
+    """
+    Cache an analyzer method's result per (method, params), valid while the data watermark holds
+    Args:
+        ttl: Seconds a result stays valid even if no new data arrives
+        key: Optional function (self, *args, **kwargs) -> hashable params key;
+            defaults to the bound arguments with defaults applied
+        cache: QueryCache to store results in (default: module-level cache)
+    Returns:
+        Decorator for methods of classes exposing a `session` attribute.
+        Cached results are shared between callers and must not be mutated.
+        New data replaces the entry for the same params instead of adding one.
+        The watermark only tracks inserts: deleted or edited rows can be
+        served from the cache until the entry's TTL expires.
+    """
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            store = cache if cache is not None else query_cache
+            if key is not None:
+                params = key(self, *args, **kwargs)
+            else:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                params = tuple(bound.arguments.items())[1:]
+
+            cache_key = (method.__qualname__, self.session.get_bind().url, params)
+            watermark = data_watermark(self.session)
+
+            entry = store.get(cache_key)
+            if entry is not _MISSING and entry[0] == watermark:
+                return entry[1]
+
+            value = method(self, *args, **kwargs)
+            store.set(cache_key, (watermark, value), ttl)
+            return value
+
+        return wrapper
+
+    return decorator
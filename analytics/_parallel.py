@@ -0,0 +1,52 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+from sqlalchemy.orm import Session
+
+def run_calls_in_parallel(
+    calls: Dict[str, Tuple[Any, str, tuple]],
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """
+    Run independent queries on one or more analyzers concurrently
+    Args:
+        calls: Mapping of result name to (analyzer, method name, positional args);
+            each worker runs on a shallow copy of the analyzer bound to its
+            own session, since sessions are not thread-safe
+        max_workers: Maximum number of concurrent queries
+    Returns:
+        Mapping of result name to the method's return value
+    """
+    def run(analyzer: Any, method_name: str, args: tuple) -> Any:
+        worker = copy.copy(analyzer)
+        worker.session = Session(bind=analyzer.session.get_bind())
+        try:
+            return getattr(worker, method_name)(*args)
+        finally:
+            worker.session.close()
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+        futures = {
+            name: executor.submit(run, *call)
+            for name, call in calls.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+def run_in_parallel(
+    analyzer: Any,
+    calls: Dict[str, Tuple[str, tuple]],
+    max_workers: int = 4
+) -> Dict[str, Any]:
+    """
+    Run independent queries of a single analyzer concurrently
+    Args:
+        analyzer: Analyzer instance the methods are called on
+        calls: Mapping of result name to (method name, positional args)
+        max_workers: Maximum number of concurrent queries
+    Returns:
+        Mapping of result name to the method's return value
+    """
+    return run_calls_in_parallel(
+        {name: (analyzer, method_name, args) for name, (method_name, args) in calls.items()},
+        max_workers
+    )
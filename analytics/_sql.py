@@ -0,0 +1,54 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round-trip from server-side cursors on large result sets
+STREAM_CHUNK_SIZE = 10000
+
+def run_df(
+    session,
+    stmt,
+    params: Optional[Dict[str, Any]] = None,
+    *,
+    stream: bool = False,
+    chunk: int = STREAM_CHUNK_SIZE,
+    **read_kwargs
+) -> pd.DataFrame:
+    """
+    Execute a statement on the session's connection and load the result into a DataFrame
+    Args:
+        session: SQLAlchemy session whose transaction the query joins
+        stmt: SQLAlchemy executable (typically a module-level text() constant)
+        params: Bind parameter values
+        stream: Read through a server-side cursor in chunks of `chunk` rows
+            instead of buffering the whole result in the driver
+        chunk: Rows per fetch when streaming
+        **read_kwargs: Passed through to pd.read_sql_query (e.g. parse_dates)
+    Returns:
+        DataFrame of the query result
+    """
+    started = time.perf_counter()
+
+    if stream:
+        chunks = pd.read_sql_query(
+            stmt.execution_options(stream_results=True),
+            session.connection(),
+            params=params,
+            chunksize=chunk,
+            **read_kwargs
+        )
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.read_sql_query(stmt, session.connection(), params=params, **read_kwargs)
+
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "%d rows in %.1f ms: %.80s",
+            len(df),
+            (time.perf_counter() - started) * 1000,
+            ' '.join(str(stmt).split())
+        )
+    return df
@@ -1,67 +1,236 @@
-from sqlalchemy import text
+from sqlalchemy import text, bindparam, Integer, Float, DateTime
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import Dict, List, Tuple
 import pandas as pd
-from datetime import datetime
-from .visualization import SocialMediaVisualizer
+from datetime import datetime, timedelta
+from ._cache import cached
+from ._parallel import run_in_parallel
+from ._sql import run_df
+from .visualization import SocialMediaVisualizer, scatter_engine
+
+# Minimum thread depth shown in the content report
+REPORT_MIN_DEPTH = 2
+
+_Q_THREAD_DEPTH = text("""
+    SELECT 
+        p.post_id,
+        p.post_preview,
+        COUNT(*) AS total_comments,
+        MAX(cd.depth) AS max_thread_depth,
+        ROUND(AVG(cd.depth), 2) AS avg_thread_depth,
+        COUNT(DISTINCT cd.user_id) AS unique_participants
+    FROM posts p
+    JOIN comment_depth cd ON p.post_id = cd.post_id
+    GROUP BY p.post_id
+    HAVING MAX(cd.depth) >= :min_depth
+    ORDER BY max_thread_depth DESC, total_comments DESC
+""").bindparams(
+    bindparam('min_depth', type_=Integer)
+)
+
+_Q_THREAD_PARTICIPANTS = text("""
+    SELECT DISTINCT
+        cd.post_id,
+        u.username
+    FROM comment_depth cd
+    JOIN users u ON cd.user_id = u.user_id
+    WHERE cd.post_id IN :post_ids
+""").bindparams(
+    bindparam('post_ids', expanding=True)
+)
+
+_Q_TIMELINE_COMMENTS = text("""
+    SELECT 
+        'comment' AS activity_type,
+        c.comment_time AS timestamp,
+        u.username,
+        c.comment_text AS content
+    FROM comments c
+    JOIN users u ON c.user_id = u.user_id
+    WHERE c.post_id = :post_id
+""").bindparams(
+    bindparam('post_id', type_=Integer)
+)
+
+_Q_TIMELINE_LIKES = text("""
+    SELECT 
+        'like' AS activity_type,
+        DATE(like_time) AS timestamp,
+        COUNT(*) AS like_count
+    FROM likes
+    WHERE post_id = :post_id
+    GROUP BY DATE(like_time)
+""").bindparams(
+    bindparam('post_id', type_=Integer)
+)
+
+_Q_CONTROVERSIAL_POSTS = text("""
+    WITH comment_stats AS (
+        -- Mean/sample stddev from the write-time sufficient statistics
+        SELECT 
+            post_id,
+            n AS total_comments,
+            sum_len * 1.0 / n AS avg_comment_length,
+            SQRT(GREATEST(
+                (sum_len_sq - CAST(sum_len AS NUMERIC) * sum_len / n) / (n - 1),
+                0
+            )) AS stddev_comment_length
+        FROM comment_length_stats
+        WHERE n >= :min_comments AND n > 1
+    ),
+    candidates AS (
+        SELECT *
+        FROM comment_stats
+        WHERE stddev_comment_length >= :min_stddev
+    ),
+    commenters AS (
+        SELECT 
+            post_id,
+            COUNT(DISTINCT user_id) AS unique_commenters
+        FROM comments
+        WHERE post_id IN (SELECT post_id FROM candidates)
+        GROUP BY post_id
+    ),
+    reply_depth AS (
+        SELECT 
+            c1.post_id,
+            COUNT(c2.comment_id) AS reply_count,
+            AVG(LENGTH(c2.comment_text)) AS avg_reply_length
+        FROM comments c1
+        JOIN comments c2 ON c1.comment_id = c2.parent_comment_id
+        WHERE c1.post_id IN (SELECT post_id FROM candidates)
+        GROUP BY c1.post_id
+    )
+    SELECT 
+        p.post_id,
+        p.post_text,
+        p.post_time,
+        u.username AS author,
+        cs.total_comments,
+        cm.unique_commenters,
+        cs.avg_comment_length,
+        cs.stddev_comment_length,
+        COALESCE(rd.reply_count, 0) AS reply_count,
+        COALESCE(rd.avg_reply_length, 0) AS avg_reply_length,
+        (cs.stddev_comment_length * cs.total_comments) AS controversy_score
+    FROM posts p
+    JOIN candidates cs ON p.post_id = cs.post_id
+    JOIN commenters cm ON p.post_id = cm.post_id
+    LEFT JOIN reply_depth rd ON p.post_id = rd.post_id
+    JOIN users u ON p.user_id = u.user_id
+    ORDER BY controversy_score DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam('limit', type_=Integer),
+    bindparam('min_comments', type_=Integer),
+    bindparam('min_stddev', type_=Float)
+)
+
+_Q_TOP_CONTRIBUTORS = text("""
+    WITH user_activity AS (
+        SELECT 
+            u.user_id,
+            u.username,
+            COALESCE(p.post_count, 0) AS post_count,
+            COALESCE(c.comment_count, 0) AS comment_count,
+            COALESCE(l.like_count, 0) AS like_count,
+            COALESCE(f.new_following, 0) AS new_following,
+            COALESCE(f2.new_followers, 0) AS new_followers
+        FROM users u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS post_count
+            FROM posts
+            WHERE post_time >= :start_date
+            GROUP BY user_id
+        ) p ON u.user_id = p.user_id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS comment_count
+            FROM comments
+            WHERE comment_time >= :start_date
+            GROUP BY user_id
+        ) c ON u.user_id = c.user_id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS like_count
+            FROM likes
+            WHERE like_time >= :start_date
+            GROUP BY user_id
+        ) l ON u.user_id = l.user_id
+        LEFT JOIN (
+            SELECT follower_id AS user_id, COUNT(*) AS new_following
+            FROM follows
+            WHERE follow_time >= :start_date
+            GROUP BY follower_id
+        ) f ON u.user_id = f.user_id
+        LEFT JOIN (
+            SELECT followee_id AS user_id, COUNT(*) AS new_followers
+            FROM follows
+            WHERE follow_time >= :start_date
+            GROUP BY followee_id
+        ) f2 ON u.user_id = f2.user_id
+    )
+    SELECT 
+        user_id,
+        username,
+        post_count,
+        comment_count,
+        like_count,
+        new_following,
+        new_followers,
+        (post_count * 3 + comment_count * 2 + like_count * 1 + new_followers * 5) AS activity_score
+    FROM user_activity
+    ORDER BY activity_score DESC
+    LIMIT :limit
+""").bindparams(
+    bindparam('limit', type_=Integer),
+    bindparam('start_date', type_=DateTime)
+)
 
 class ContentAnalyzer:
     def __init__(self, session: Session):
         self.session = session
         self.visualizer = SocialMediaVisualizer(dark_mode=True)
     
-    def analyze_thread_depth(self, min_depth: int = 2) -> List[Dict[str, Any]]:
+    @cached()
+    def analyze_thread_depth(self, min_depth: int = 2, include_participants: bool = True) -> pd.DataFrame:
         """
         Analyze comment thread depths and identify posts with deep conversations
         Args:
             min_depth: Minimum thread depth to consider (default: 2)
+            include_participants: Add a comma-separated participants column
         Returns:
-            List of dictionaries containing thread depth analysis
+            DataFrame containing thread depth analysis
         """
-        query = text("""
-            WITH RECURSIVE comment_threads AS (
-                -- Base case: top-level comments
-                SELECT 
-                    comment_id,
-                    post_id,
-                    user_id,
-                    parent_comment_id,
-                    comment_text,
-                    1 AS depth
-                FROM comments
-                WHERE parent_comment_id IS NULL
-                
-                UNION ALL
-                
-                -- Recursive case: replies
-                SELECT 
-                    c.comment_id,
-                    c.post_id,
-                    c.user_id,
-                    c.parent_comment_id,
-                    c.comment_text,
-                    ct.depth + 1 AS depth
-                FROM comments c
-                JOIN comment_threads ct ON c.parent_comment_id = ct.comment_id
-            )
-            SELECT 
-                p.post_id,
-                SUBSTRING(p.post_text, 1, 50) AS post_preview,
-                COUNT(DISTINCT ct.comment_id) AS total_comments,
-                MAX(ct.depth) AS max_thread_depth,
-                ROUND(AVG(ct.depth), 2) AS avg_thread_depth,
-                COUNT(DISTINCT ct.user_id) AS unique_participants,
-                GROUP_CONCAT(DISTINCT u.username ORDER BY u.username SEPARATOR ', ') AS participants
-            FROM posts p
-            JOIN comment_threads ct ON p.post_id = ct.post_id
-            JOIN users u ON ct.user_id = u.user_id
-            GROUP BY p.post_id, p.post_text
-            HAVING MAX(ct.depth) >= :min_depth
-            ORDER BY max_thread_depth DESC, total_comments DESC
-        """)
+        thread_df = run_df(
+            self.session,
+            _Q_THREAD_DEPTH,
+            params={'min_depth': min_depth}
+        )
         
-        result = self.session.execute(query, {'min_depth': min_depth}).fetchall()
-        return [dict(row) for row in result]
+        if include_participants:
+            participants = self.get_thread_participants(thread_df['post_id'].tolist())
+            thread_df['participants'] = thread_df['post_id'].map(participants)
+        
+        return thread_df
+    
+    def get_thread_participants(self, post_ids: List[int]) -> pd.Series:
+        """
+        Get the commenters on each of the given posts
+        Args:
+            post_ids: IDs of the posts to look up
+        Returns:
+            Series indexed by post_id of sorted, comma-separated usernames
+        """
+        if not post_ids:
+            return pd.Series(dtype=object)
+        
+        participants_df = run_df(
+            self.session,
+            _Q_THREAD_PARTICIPANTS,
+            params={'post_ids': post_ids}
+        )
+        return participants_df.groupby('post_id')['username'].agg(
+            lambda usernames: ', '.join(sorted(usernames))
+        )
     
     def get_post_activity_timeline(self, post_id: int) -> pd.DataFrame:
         """
@@ -69,101 +238,66 @@ class ContentAnalyzer:
         Args:
             post_id: ID of the post to analyze
         Returns:
-            DataFrame with timeline of comments and likes
+            DataFrame with timeline of comments and daily like counts
         """
-        query = text("""
-            SELECT 
-                'comment' AS activity_type,
-                c.comment_time AS timestamp,
-                u.username,
-                c.comment_text AS content,
-                NULL AS like_count
-            FROM comments c
-            JOIN users u ON c.user_id = u.user_id
-            WHERE c.post_id = :post_id
-            
-            UNION ALL
-            
-            SELECT 
-                'like' AS activity_type,
-                l.like_time AS timestamp,
-                u.username,
-                NULL AS content,
-                COUNT(*) OVER (PARTITION BY DATE(l.like_time)) AS like_count
-            FROM likes l
-            JOIN users u ON l.user_id = u.user_id
-            WHERE l.post_id = :post_id
-            ORDER BY timestamp
-        """)
+        params = {'post_id': post_id}
+        comments_df = run_df(
+            self.session,
+            _Q_TIMELINE_COMMENTS,
+            params=params,
+            parse_dates=['timestamp']
+        )
+        likes_df = run_df(
+            self.session,
+            _Q_TIMELINE_LIKES,
+            params=params,
+            parse_dates=['timestamp']
+        )
         
-        result = self.session.execute(query, {'post_id': post_id}).fetchall()
-        return pd.DataFrame([dict(row) for row in result])
+        return pd.concat([comments_df, likes_df], ignore_index=True).sort_values(
+            'timestamp',
+            ignore_index=True
+        )
     
-    def identify_controversial_posts(self, min_comments: int = 10, min_stddev: float = 2.0) -> List[Dict[str, Any]]:
+    @cached()
+    def identify_controversial_posts(
+        self, 
+        min_comments: int = 10, 
+        min_stddev: float = 2.0,
+        limit: int = 100
+    ) -> pd.DataFrame:
         """
         Identify posts with controversial discussions based on comment patterns
         Args:
             min_comments: Minimum number of comments to consider
             min_stddev: Minimum standard deviation of reply depths
+            limit: Maximum number of posts to return, most controversial first
         Returns:
-            List of controversial posts with metrics
+            DataFrame of controversial posts with metrics
         """
-        query = text("""
-            WITH comment_stats AS (
-                SELECT 
-                    post_id,
-                    COUNT(*) AS total_comments,
-                    AVG(LENGTH(comment_text)) AS avg_comment_length,
-                    STDDEV(LENGTH(comment_text)) AS stddev_comment_length,
-                    COUNT(DISTINCT user_id) AS unique_commenters
-                FROM comments
-                GROUP BY post_id
-                HAVING COUNT(*) >= :min_comments
-            ),
-            reply_depth AS (
-                SELECT 
-                    c1.post_id,
-                    COUNT(c2.comment_id) AS reply_count,
-                    AVG(LENGTH(c2.comment_text)) AS avg_reply_length
-                FROM comments c1
-                JOIN comments c2 ON c1.comment_id = c2.parent_comment_id
-                GROUP BY c1.post_id
-            )
-            SELECT 
-                p.post_id,
-                p.post_text,
-                p.post_time,
-                u.username AS author,
-                cs.total_comments,
-                cs.unique_commenters,
-                cs.avg_comment_length,
-                cs.stddev_comment_length,
-                COALESCE(rd.reply_count, 0) AS reply_count,
-                COALESCE(rd.avg_reply_length, 0) AS avg_reply_length,
-                (cs.stddev_comment_length * cs.total_comments) AS controversy_score
-            FROM posts p
-            JOIN comment_stats cs ON p.post_id = cs.post_id
-            LEFT JOIN reply_depth rd ON p.post_id = rd.post_id
-            JOIN users u ON p.user_id = u.user_id
-            WHERE cs.stddev_comment_length >= :min_stddev
-            ORDER BY controversy_score DESC
-        """)
-        
-        result = self.session.execute(
-            query, 
-            {'min_comments': min_comments, 'min_stddev': min_stddev}
-        ).fetchall()
-        return [dict(row) for row in result]
+        return run_df(
+            self.session,
+            _Q_CONTROVERSIAL_POSTS,
+            params={
+                'min_comments': min_comments,
+                'min_stddev': min_stddev,
+                'limit': limit
+            }
+        )
+    
+    def report_queries(self, min_depth: int = REPORT_MIN_DEPTH) -> Dict[str, Tuple[str, tuple]]:
+        """Cached queries behind analyze_and_visualize_content, as run_in_parallel calls"""
+        return {
+            'threads': ('analyze_thread_depth', (min_depth, False)),
+            'controversial': ('identify_controversial_posts', ())
+        }
     
-    def analyze_and_visualize_content(self, min_depth: int = 2) -> None:
+    def analyze_and_visualize_content(self, min_depth: int = REPORT_MIN_DEPTH) -> None:
         """Run complete content analysis and create visualizations"""
         # Get data
-        thread_data = self.analyze_thread_depth(min_depth)
-        controversial_posts = self.identify_controversial_posts()
-        
-        # Convert to DataFrames
-        thread_df = pd.DataFrame(thread_data)
-        controversial_df = pd.DataFrame(controversial_posts)
+        results = run_in_parallel(self, self.report_queries(min_depth))
+        thread_df = results['threads']
+        controversial_df = results['controversial']
         
         # Visualizations
         print("\n=== Thread Depth Analysis ===")
@@ -179,22 +313,22 @@ class ContentAnalyzer:
                 engine='plotly'
             )
         
-        # Metrics
+        # Metrics (rows arrive ordered by max_thread_depth DESC from SQL)
         print("\nPosts with Deepest Threads:")
-        print(thread_df.nlargest(5, 'max_thread_depth')[
+        print(thread_df.head(5)[
             ['post_id', 'post_preview', 'max_thread_depth', 'unique_participants']
         ].to_string(index=False))
         
         if not controversial_df.empty:
             print("\nMost Controversial Posts:")
-            print(controversial_df.nlargest(3, 'controversy_score')[
+            print(controversial_df.head(3)[
                 ['post_id', 'author', 'controversy_score', 'total_comments']
             ].to_string(index=False))
         
-        avg_thread_depth = thread_df['avg_thread_depth'].mean()
-        print(f"\nAverage Thread Depth: {avg_thread_depth:.1f}")
-        
         if not thread_df.empty:
+            avg_thread_depth = thread_df['avg_thread_depth'].to_numpy(dtype=float).mean()
+            print(f"\nAverage Thread Depth: {avg_thread_depth:.1f}")
+            
             # Analyze a sample post's activity timeline
             sample_post = thread_df.iloc[0]['post_id']
             timeline = self.get_post_activity_timeline(sample_post)
@@ -203,9 +337,10 @@ class ContentAnalyzer:
             self.visualizer.plot_activity_timeline(
                 timeline,
                 title=f"Activity Timeline for Post {sample_post}",
-                engine='plotly'
+                engine=scatter_engine(len(timeline))
             )
 
+    @cached()
     def get_top_contributors(self, days: int = 30, limit: int = 5) -> pd.DataFrame:
         """
         Identify the most active contributors in the network
@@ -215,40 +350,9 @@ class ContentAnalyzer:
         Returns:
             DataFrame with top contributors and their activity metrics
         """
-        query = text("""
-            WITH user_activity AS (
-                SELECT 
-                    u.user_id,
-                    u.username,
-                    COUNT(DISTINCT p.post_id) AS post_count,
-                    COUNT(DISTINCT c.comment_id) AS comment_count,
-                    COUNT(DISTINCT l.like_id) AS like_count,
-                    COUNT(DISTINCT CASE WHEN f.follow_time >= NOW() - INTERVAL ':days DAYS' THEN f.followee_id END) AS new_following,
-                    COUNT(DISTINCT CASE WHEN f2.follow_time >= NOW() - INTERVAL ':days DAYS' THEN f2.follower_id END) AS new_followers
-                FROM users u
-                LEFT JOIN posts p ON u.user_id = p.user_id AND p.post_time >= NOW() - INTERVAL ':days DAYS'
-                LEFT JOIN comments c ON u.user_id = c.user_id AND c.comment_time >= NOW() - INTERVAL ':days DAYS'
-                LEFT JOIN likes l ON u.user_id = l.user_id AND l.like_time >= NOW() - INTERVAL ':days DAYS'
-                LEFT JOIN follows f ON u.user_id = f.follower_id AND f.follow_time >= NOW() - INTERVAL ':days DAYS'
-                LEFT JOIN follows f2 ON u.user_id = f2.followee_id AND f2.follow_time >= NOW() - INTERVAL ':days DAYS'
-                GROUP BY u.user_id, u.username
-            )
-            SELECT 
-                user_id,
-                username,
-                post_count,
-                comment_count,
-                like_count,
-                new_following,
-                new_followers,
-                (post_count * 3 + comment_count * 2 + like_count * 1 + new_followers * 5) AS activity_score
-            FROM user_activity
-            ORDER BY activity_score DESC
-            LIMIT :limit
-        """)
-        
-        result = self.session.execute(
-            query, 
-            {'days': days, 'limit': limit}
-        ).fetchall()
-        return pd.DataFrame([dict(row) for row in result])
\ No newline at end of file
+        start_date = datetime.utcnow() - timedelta(days=days)
+        return run_df(
+            self.session,
+            _Q_TOP_CONTRIBUTORS,
+            params={'start_date': start_date, 'limit': limit}
+        )
\ No newline at end of file
@@ -1,95 +1,145 @@
-from sqlalchemy import func, case, text
+from sqlalchemy import text, bindparam, Integer, DateTime
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import pandas as pd
-from .visualization import SocialMediaVisualizer
+from ._cache import cached
+from ._parallel import run_in_parallel
+from ._sql import run_df
+from .visualization import SocialMediaVisualizer, scatter_engine
+
+# Look-back window of the engagement report
+REPORT_DAYS = 30
+
+_Q_POST_ENGAGEMENT = text("""
+    WITH post_stats AS (
+        SELECT 
+            p.post_id,
+            p.user_id AS author_id,
+            u.username AS author_name,
+            p.post_text,
+            p.post_time,
+            COALESCE(pes.like_count, 0) AS like_count,
+            COALESCE(pes.comment_count, 0) AS comment_count,
+            COALESCE(ufc.follower_count, 0) AS follower_count
+        FROM posts p
+        JOIN users u ON p.user_id = u.user_id
+        LEFT JOIN post_engagement_stats pes ON p.post_id = pes.post_id
+        LEFT JOIN user_follower_count ufc ON p.user_id = ufc.user_id
+        WHERE p.post_time >= :start_date
+    ),
+    ranked_posts AS (
+        SELECT 
+            post_id,
+            author_id,
+            author_name,
+            post_text,
+            post_time,
+            like_count,
+            comment_count,
+            follower_count,
+            ROUND((like_count + comment_count) * 100.0 / NULLIF(follower_count, 0), 2) AS engagement_rate,
+            RANK() OVER (ORDER BY (like_count + comment_count) DESC) AS engagement_rank
+        FROM post_stats
+    )
+    SELECT *
+    FROM ranked_posts
+    WHERE engagement_rank <= COALESCE(:rank_threshold, engagement_rank)
+    ORDER BY engagement_rate DESC
+""").bindparams(
+    bindparam('rank_threshold', type_=Integer),
+    bindparam('start_date', type_=DateTime)
+)
+
+_Q_USER_ENGAGEMENT_SUMMARY = text("""
+    SELECT 
+        u.user_id,
+        u.username,
+        COALESCE(p.post_count, 0) AS post_count,
+        COALESCE(l.likes_received, 0) AS likes_received,
+        COALESCE(c.comments_received, 0) AS comments_received,
+        COALESCE(f.follower_count, 0) AS follower_count,
+        COALESCE(fl.following_count, 0) AS following_count,
+        ROUND(COALESCE(l.likes_received, 0) * 100.0 / 
+            NULLIF(f.follower_count, 0), 2) AS avg_like_rate,
+        ROUND(COALESCE(c.comments_received, 0) * 100.0 / 
+            NULLIF(f.follower_count, 0), 2) AS avg_comment_rate
+    FROM users u
+    LEFT JOIN (
+        SELECT user_id, COUNT(*) AS post_count
+        FROM posts
+        GROUP BY user_id
+    ) p ON u.user_id = p.user_id
+    LEFT JOIN (
+        SELECT p.user_id, COUNT(*) AS likes_received
+        FROM likes l
+        JOIN posts p ON l.post_id = p.post_id
+        GROUP BY p.user_id
+    ) l ON u.user_id = l.user_id
+    LEFT JOIN (
+        SELECT p.user_id, COUNT(*) AS comments_received
+        FROM comments c
+        JOIN posts p ON c.post_id = p.post_id
+        GROUP BY p.user_id
+    ) c ON u.user_id = c.user_id
+    LEFT JOIN (
+        SELECT followee_id AS user_id, COUNT(*) AS follower_count
+        FROM follows
+        GROUP BY followee_id
+    ) f ON u.user_id = f.user_id
+    LEFT JOIN (
+        SELECT follower_id AS user_id, COUNT(*) AS following_count
+        FROM follows
+        GROUP BY follower_id
+    ) fl ON u.user_id = fl.user_id
+    ORDER BY likes_received DESC
+""")
 
 class EngagementAnalyzer:
     def __init__(self, session: Session):
         self.session = session
     
-    def get_post_engagement(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Calculate engagement metrics for posts within a time period"""
-        query = text("""
-            WITH post_stats AS (
-                SELECT 
-                    p.post_id,
-                    p.user_id AS author_id,
-                    u.username AS author_name,
-                    p.post_text,
-                    p.post_time,
-                    COUNT(DISTINCT l.user_id) AS like_count,
-                    COUNT(DISTINCT c.comment_id) AS comment_count,
-                    COUNT(DISTINCT f.follower_id) AS follower_count
-                FROM posts p
-                LEFT JOIN likes l ON p.post_id = l.post_id
-                LEFT JOIN comments c ON p.post_id = c.post_id
-                JOIN users u ON p.user_id = u.user_id
-                LEFT JOIN follows f ON p.user_id = f.followee_id
-                WHERE p.post_time >= :start_date
-                GROUP BY p.post_id, p.user_id, u.username, p.post_text, p.post_time
-            )
-            SELECT 
-                post_id,
-                author_id,
-                author_name,
-                post_text,
-                post_time,
-                like_count,
-                comment_count,
-                follower_count,
-                ROUND((like_count + comment_count) * 100.0 / NULLIF(follower_count, 0), 2) AS engagement_rate,
-                RANK() OVER (ORDER BY (like_count + comment_count) DESC) AS engagement_rank
-            FROM post_stats
-            ORDER BY engagement_rate DESC
-        """)
-        
+    @cached()
+    def get_post_engagement(self, days: int = 30, rank_threshold: Optional[int] = None) -> pd.DataFrame:
+        """
+        Calculate engagement metrics for posts within a time period
+        Args:
+            days: Lookback period in days
+            rank_threshold: Only return posts with engagement_rank <= this value
+                (default: all posts)
+        Returns:
+            DataFrame of posts with engagement metrics
+        """
         start_date = datetime.utcnow() - timedelta(days=days)
-        result = self.session.execute(
-            query, 
-            {'start_date': start_date}
-        ).fetchall()
-        
-        return [dict(row) for row in result]
+        return run_df(
+            self.session,
+            _Q_POST_ENGAGEMENT,
+            params={'start_date': start_date, 'rank_threshold': rank_threshold},
+            stream=True
+        )
     
+    @cached()
     def get_user_engagement_summary(self) -> pd.DataFrame:
         """Generate engagement summary per user"""
-        query = text("""
-            SELECT 
-                u.user_id,
-                u.username,
-                COUNT(DISTINCT p.post_id) AS post_count,
-                COUNT(DISTINCT l.like_id) AS likes_received,
-                COUNT(DISTINCT c.comment_id) AS comments_received,
-                COUNT(DISTINCT f.follower_id) AS follower_count,
-                COUNT(DISTINCT fl.followee_id) AS following_count,
-                ROUND(COUNT(DISTINCT l.like_id) * 100.0 / 
-                    NULLIF(COUNT(DISTINCT f.follower_id), 0), 2) AS avg_like_rate,
-                ROUND(COUNT(DISTINCT c.comment_id) * 100.0 / 
-                    NULLIF(COUNT(DISTINCT f.follower_id), 0), 2) AS avg_comment_rate
-            FROM users u
-            LEFT JOIN posts p ON u.user_id = p.user_id
-            LEFT JOIN likes l ON p.post_id = l.post_id
-            LEFT JOIN comments c ON p.post_id = c.post_id
-            LEFT JOIN follows f ON u.user_id = f.followee_id
-            LEFT JOIN follows fl ON u.user_id = fl.follower_id
-            GROUP BY u.user_id, u.username
-            ORDER BY likes_received DESC
-        """)
-        
-        result = self.session.execute(query).fetchall()
-        return pd.DataFrame([dict(row) for row in result])
+        return run_df(
+            self.session,
+            _Q_USER_ENGAGEMENT_SUMMARY,
+            stream=True
+        )
+    
+    def report_queries(self, days: int = REPORT_DAYS) -> Dict[str, Tuple[str, tuple]]:
+        """Cached queries behind analyze_and_visualize_engagement, as run_in_parallel calls"""
+        return {
+            'posts': ('get_post_engagement', (days,)),
+            'users': ('get_user_engagement_summary', ())
+        }
     
-    def analyze_and_visualize_engagement(self, days: int = 30) -> None:
+    def analyze_and_visualize_engagement(self, days: int = REPORT_DAYS) -> None:
         """Run analysis and create visualizations for engagement"""
         # Get data
-        engagement_data = self.get_post_engagement(days)
-        user_engagement = self.get_user_engagement_summary()
-        
-        # Convert to DataFrames
-        engagement_df = pd.DataFrame(engagement_data)
-        user_engagement_df = user_engagement.copy()
+        results = run_in_parallel(self, self.report_queries(days))
+        engagement_df = results['posts']
+        user_engagement_df = results['users']
         
         # Visualizations
         print("\nEngagement Trends Over Time:")
@@ -101,7 +151,7 @@ class EngagementAnalyzer:
         print("\nUser Engagement Matrix:")
         self.visualizer.plot_user_engagement_matrix(
             user_engagement_df,
-            engine='plotly'
+            engine=scatter_engine(len(user_engagement_df))
         )
         
         # Additional metrics
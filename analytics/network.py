@@ -1,32 +1,103 @@
-from typing import List, Dict, Any
+from typing import Any, Dict, List, Optional, Tuple
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import text, bindparam, Integer
+from ._cache import cached
+from ._parallel import run_in_parallel
+from ._sql import run_df
 from .visualization import SocialMediaVisualizer
 
+# Edges beyond this are sampled server-side before plotting
+MAX_PLOTTED_EDGES = 5000
+
+_FOLLOWER_NETWORK_SQL = """
+    SELECT 
+        u1.username AS follower_username,
+        u2.username AS followee_username,
+        f.follow_time
+    FROM follows f
+    JOIN users u1 ON f.follower_id = u1.user_id
+    JOIN users u2 ON f.followee_id = u2.user_id
+"""
+
+_Q_FOLLOWER_NETWORK = text(_FOLLOWER_NETWORK_SQL)
+
+# Hash-ordered rather than RANDOM() so the same graph yields the same sample,
+# which keeps the plotted layout cacheable between runs
+_Q_FOLLOWER_NETWORK_SAMPLE = text(
+    _FOLLOWER_NETWORK_SQL
+    + "    ORDER BY MD5(CAST(f.follower_id AS TEXT) || '-' || CAST(f.followee_id AS TEXT))\n"
+    + "    LIMIT :sample\n"
+).bindparams(
+    bindparam('sample', type_=Integer)
+)
+
+_Q_NETWORK_STATS = text("""
+    SELECT 
+        COUNT(*) AS num_edges,
+        (
+            SELECT COUNT(*) FROM (
+                SELECT follower_id FROM follows
+                UNION
+                SELECT followee_id FROM follows
+            ) AS nodes
+        ) AS num_users
+    FROM follows
+""")
+
 class NetworkAnalyzer:
     def __init__(self, session):
         self.session = session
         self.visualizer = SocialMediaVisualizer(dark_mode=True)
     
-    def get_follower_network(self) -> pd.DataFrame:
-        """Get complete follower network relationships"""
-        query = text("""
-            SELECT 
-                u1.username AS follower_username,
-                u2.username AS followee_username,
-                f.follow_time
-            FROM follows f
-            JOIN users u1 ON f.follower_id = u1.user_id
-            JOIN users u2 ON f.followee_id = u2.user_id
-        """)
-        result = self.session.execute(query).fetchall()
-        return pd.DataFrame([dict(row) for row in result])
+    @cached()
+    def get_follower_network(self, sample: Optional[int] = None) -> pd.DataFrame:
+        """
+        Get follower network relationships
+        Args:
+            sample: Return at most this many edges, a fixed pseudo-random
+                subset chosen by hashing the edge IDs (default: all)
+        Returns:
+            DataFrame with one row per follow edge
+        """
+        if sample is None:
+            return run_df(
+                self.session,
+                _Q_FOLLOWER_NETWORK,
+                stream=True
+            )
+        
+        return run_df(
+            self.session,
+            _Q_FOLLOWER_NETWORK_SAMPLE,
+            params={'sample': sample}
+        )
+    
+    @cached()
+    def get_network_stats(self) -> Dict[str, Any]:
+        """Count users and connections in the follow graph and compute its density"""
+        stats = dict(self.session.execute(_Q_NETWORK_STATS).mappings().one())
+        
+        max_possible_edges = stats['num_users'] * (stats['num_users'] - 1)
+        stats['density'] = stats['num_edges'] / max_possible_edges if max_possible_edges else 0.0
+        return stats
+    
+    def report_queries(self) -> Dict[str, Tuple[str, tuple]]:
+        """Cached queries behind analyze_and_visualize_network, as run_in_parallel calls"""
+        return {
+            'network': ('get_follower_network', (MAX_PLOTTED_EDGES,)),
+            'stats': ('get_network_stats', ())
+        }
     
     def analyze_and_visualize_network(self) -> None:
         """Run analysis and create visualizations for network"""
         # Get data
-        ghost_followers = self.identify_ghost_followers()
-        network_data = self.get_follower_network()
+        results = run_in_parallel(self, {
+            'ghosts': ('identify_ghost_followers', ()),
+            **self.report_queries()
+        })
+        ghost_followers = results['ghosts']
+        network_data = results['network']
+        stats = results['stats']
         
         # Visualizations
         print("\nFollower Network Visualization:")
@@ -39,12 +110,6 @@ class NetworkAnalyzer:
         print("\nGhost Followers (Never Interacted):")
         print(ghost_followers[['username', 'following_count']].to_string(index=False))
         
-        # Calculate network density
-        num_users = network_data[['follower_username', 'followee_username']].stack().nunique()
-        num_edges = len(network_data)
-        max_possible_edges = num_users * (num_users - 1)
-        density = num_edges / max_possible_edges
-        
-        print(f"\nNetwork Density: {density:.2%}")
-        print(f"Total Users: {num_users}")
-        print(f"Total Connections: {num_edges}")
\ No newline at end of file
+        print(f"\nNetwork Density: {stats['density']:.2%}")
+        print(f"Total Users: {stats['num_users']}")
+        print(f"Total Connections: {stats['num_edges']}")
\ No newline at end of file
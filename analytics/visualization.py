@@ -1,27 +1,281 @@
+import hashlib
+import importlib.util
+import logging
+import os
 import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import numpy as np
 import pandas as pd
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Scatter inputs larger than this should be rasterized (engine='datashader')
+RASTERIZE_THRESHOLD = 5000
+
+# Datashader is optional; without it large scatters stay on plotly (WebGL)
+HAS_DATASHADER = importlib.util.find_spec('datashader') is not None
+
+# Plotly scatters with at least this many points render through WebGL instead of SVG
+WEBGL_THRESHOLD = 5000
+
+# Graphs with more nodes than this get a circular layout instead of a spring layout
+_MAX_SPRING_NODES = 1000
+
+# Network layouts persist here between runs, one parquet file per edge set
+LAYOUT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'sma_layout')
+
+# Parquet needs pyarrow or fastparquet; without either, layouts are only cached in memory
+_CAN_PERSIST_LAYOUTS = any(
+    importlib.util.find_spec(engine) is not None for engine in ('pyarrow', 'fastparquet')
+)
+
+_MAX_CACHED_LAYOUTS = 32
+_MAX_PERSISTED_LAYOUTS = 64
+_layout_cache = {}
+
+def _spring_layout(
+    num_nodes: int,
+    src: np.ndarray,
+    dst: np.ndarray,
+    iterations: int = 50,
+    seed: int = 0
+) -> np.ndarray:
+    """Fruchterman-Reingold force-directed layout; returns an (num_nodes, 2) array"""
+    if num_nodes > _MAX_SPRING_NODES:
+        angles = np.linspace(0, 2 * np.pi, num_nodes, endpoint=False)
+        return np.column_stack([np.cos(angles), np.sin(angles)])
+    
+    pos = np.random.default_rng(seed).random((num_nodes, 2))
+    if num_nodes < 2:
+        return pos
+    
+    k = np.sqrt(1.0 / num_nodes)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        # Repulsion between every pair of nodes
+        delta = pos[:, None, :] - pos[None, :, :]
+        dist = np.linalg.norm(delta, axis=-1).clip(0.01)
+        disp = np.einsum('ijk,ij->ik', delta, (k / dist) ** 2)
+        
+        # Attraction along edges
+        edge_delta = pos[src] - pos[dst]
+        edge_dist = np.linalg.norm(edge_delta, axis=1, keepdims=True).clip(0.01)
+        force = edge_delta * edge_dist / k
+        np.add.at(disp, src, -force)
+        np.add.at(disp, dst, force)
+        
+        length = np.linalg.norm(disp, axis=1, keepdims=True).clip(0.01)
+        pos += disp / length * np.minimum(length, temperature)
+        temperature -= cooling
+    
+    return pos
+
+def _prune_layout_dir(keep: int = _MAX_PERSISTED_LAYOUTS) -> None:
+    """Delete all but the `keep` most recently used layout files"""
+    paths = [
+        os.path.join(LAYOUT_CACHE_DIR, name)
+        for name in os.listdir(LAYOUT_CACHE_DIR)
+        if name.endswith('.parquet')
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def scatter_engine(num_points: int) -> str:
+    """Pick the plot engine for a scatter of num_points: rasterize large ones when Datashader is installed"""
+    if HAS_DATASHADER and num_points > RASTERIZE_THRESHOLD:
+        return 'datashader'
+    return 'plotly'
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling; returns the indices of the points to keep"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        
+        # Third triangle vertex: mean of the next bucket, or the last point
+        if i < n_out - 3:
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        
+        prev_x, prev_y = x[kept[i]], y[kept[i]]
+        area = np.abs(
+            (prev_x - next_x) * (y[start:end] - prev_y)
+            - (prev_x - x[start:end]) * (next_y - prev_y)
+        )
+        kept[i + 1] = start + np.argmax(area)
+    
+    return kept
+
 class SocialMediaVisualizer:
+    # Style settings keyed by dark_mode
+    _MPL_STYLES = {True: 'dark_background', False: 'seaborn'}
+    _BG_COLORS = {True: '#1a1a1a', False: '#ffffff'}
+    _TEXT_COLORS = {True: '#ffffff', False: '#000000'}
+    _PLOTLY_TEMPLATES = {True: 'plotly_dark', False: 'plotly_white'}
+    
+    # Mode whose matplotlib style is currently applied (None until first use)
+    _styled_mode = None
+    
     def __init__(self, dark_mode: bool = False):
-        self.dark_mode = dark_mode
-        self._set_style()
+        self.dark_mode = bool(dark_mode)
+        self._ensure_style(self.dark_mode)
+        self.bg_color = self._BG_COLORS[self.dark_mode]
+        self.text_color = self._TEXT_COLORS[self.dark_mode]
+        self.plotly_template = self._PLOTLY_TEMPLATES[self.dark_mode]
     
-    def _set_style(self):
-        """Set consistent style for all visualizations"""
-        if self.dark_mode:
-            plt.style.use('dark_background')
-            self.bg_color = '#1a1a1a'
-            self.text_color = '#ffffff'
-            self.plotly_template = 'plotly_dark'
+    @classmethod
+    def _ensure_style(cls, dark_mode: bool) -> None:
+        """Set consistent matplotlib style for all visualizations, once per mode change"""
+        if cls._styled_mode == dark_mode:
+            return
+        plt.style.use(cls._MPL_STYLES[dark_mode])
+        cls._styled_mode = dark_mode
+    
+    def _plot_rasterized(
+        self,
+        x: pd.Series,
+        y: pd.Series,
+        title: str,
+        x_title: str,
+        y_title: str,
+        width: int = 800,
+        height: int = 600
+    ) -> go.Figure:
+        """Rasterize a large scatter with Datashader and wrap the image in a Plotly figure"""
+        import datashader as ds
+        import datashader.transfer_functions as tf
+        from datashader.colors import viridis
+        
+        is_time = pd.api.types.is_datetime64_any_dtype(x)
+        if is_time:
+            # NaT casts to int64.min rather than NaN, so mask it explicitly
+            x_values = x.to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(float)
+            x_values[x.isna().to_numpy()] = np.nan
         else:
-            plt.style.use('seaborn')
-            self.bg_color = '#ffffff'
-            self.text_color = '#000000'
-            self.plotly_template = 'plotly_white'
+            x_values = x.to_numpy(dtype=float, na_value=np.nan)
+        points = pd.DataFrame({
+            'x': x_values,
+            'y': y.to_numpy(dtype=float, na_value=np.nan)
+        }).dropna()
+        
+        if points.empty:
+            # Nothing plottable: an empty figure instead of NaN canvas ranges
+            fig = go.Figure()
+            fig.update_layout(
+                title=title,
+                xaxis_title=x_title,
+                yaxis_title=y_title,
+                template=self.plotly_template
+            )
+            return fig
+        
+        def extent(values):
+            low, high = float(values.min()), float(values.max())
+            pad = (high - low) * 0.05 or 0.5
+            return low - pad, high + pad
+        
+        x_range, y_range = extent(points['x']), extent(points['y'])
+        canvas = ds.Canvas(
+            plot_width=width,
+            plot_height=height,
+            x_range=x_range,
+            y_range=y_range
+        )
+        img = tf.shade(canvas.points(points, 'x', 'y', agg=ds.count()), cmap=viridis)
+        
+        # PIL images are top-down; flip so row 0 sits at y_range[0]
+        fig = go.Figure(go.Image(
+            z=np.flipud(np.asarray(img.to_pil())),
+            colormodel='rgba',
+            x0=x_range[0],
+            dx=(x_range[1] - x_range[0]) / width,
+            y0=y_range[0],
+            dy=(y_range[1] - y_range[0]) / height,
+            hoverinfo='skip'
+        ))
+        fig.update_layout(
+            title=title,
+            xaxis_title=x_title,
+            yaxis_title=y_title,
+            template=self.plotly_template
+        )
+        fig.update_yaxes(autorange=True)
+        
+        if is_time:
+            ticks = np.linspace(x_range[0], x_range[1], 6)
+            fig.update_xaxes(
+                tickvals=ticks,
+                ticktext=pd.to_datetime(ticks).strftime('%Y-%m-%d %H:%M')
+            )
+        
+        return fig
+    
+    def _network_layout(self, network_data: pd.DataFrame) -> pd.DataFrame:
+        """Node positions for a follow graph, computed once per distinct edge set and kept on disk"""
+        edges = network_data[['follower_username', 'followee_username']].drop_duplicates()
+        edges = edges.sort_values(['follower_username', 'followee_username'])
+        key = hashlib.sha1(
+            pd.util.hash_pandas_object(edges, index=False).to_numpy().tobytes()
+        ).hexdigest()
+        
+        layout = _layout_cache.get(key)
+        cache_path = os.path.join(LAYOUT_CACHE_DIR, f'{key}.parquet')
+        if layout is None and _CAN_PERSIST_LAYOUTS and os.path.exists(cache_path):
+            try:
+                layout = pd.read_parquet(cache_path)
+                os.utime(cache_path)  # mark as recently used for pruning
+            except (OSError, ValueError) as e:
+                # Truncated or corrupt file (ArrowInvalid is a ValueError): recompute
+                logger.warning("Discarding unreadable layout cache %s: %s", cache_path, e)
+                layout = None
+                try:
+                    os.remove(cache_path)
+                except OSError:
+                    pass
+        
+        if layout is None:
+            nodes = pd.unique(edges.to_numpy().ravel())
+            node_index = pd.Series(np.arange(len(nodes)), index=nodes)
+            src = node_index.reindex(edges['follower_username']).to_numpy()
+            dst = node_index.reindex(edges['followee_username']).to_numpy()
+            layout = pd.DataFrame(
+                _spring_layout(len(nodes), src, dst),
+                index=nodes,
+                columns=['x', 'y']
+            )
+            
+            # Circular fallbacks are cheap to recompute; only spring layouts are persisted
+            if _CAN_PERSIST_LAYOUTS and len(nodes) <= _MAX_SPRING_NODES:
+                try:
+                    os.makedirs(LAYOUT_CACHE_DIR, exist_ok=True)
+                    layout.to_parquet(cache_path)
+                    _prune_layout_dir()
+                except (OSError, ValueError) as e:
+                    logger.warning("Could not persist layout to %s: %s", cache_path, e)
+        
+        if key not in _layout_cache:
+            if len(_layout_cache) >= _MAX_CACHED_LAYOUTS:
+                _layout_cache.pop(next(iter(_layout_cache)))
+            _layout_cache[key] = layout
+        
+        return layout
     
     def plot_engagement_trends(
         self, 
@@ -29,9 +283,28 @@ class SocialMediaVisualizer:
         time_col: str = 'post_time',
         engagement_col: str = 'engagement_rate',
         fig_size: tuple = (12, 6),
-        engine: str = 'matplotlib'
+        engine: str = 'matplotlib',
+        max_points: Optional[int] = 2000
     ) -> None:
-        """Plot engagement trends over time"""
+        """
+        Plot engagement trends over time
+        Args:
+            max_points: Longer series are downsampled to this many points
+                with LTTB before plotting; None plots every point
+        """
+        if max_points is not None and len(df) > max_points:
+            # Rates are NULL for authors without followers; NaNs would poison
+            # the bucket means and win every argmax, so leave them out
+            df = df.dropna(subset=[time_col, engagement_col]).sort_values(time_col)
+            x = df[time_col].to_numpy()
+            if np.issubdtype(x.dtype, np.datetime64):
+                x = x.astype('datetime64[ns]').astype(np.int64)
+            df = df.iloc[_lttb_indices(
+                x.astype(float),
+                df[engagement_col].to_numpy(dtype=float),
+                max_points
+            )]
+        
         if engine == 'matplotlib':
             plt.figure(figsize=fig_size)
             df.set_index(time_col)[engagement_col].plot(
@@ -69,17 +342,27 @@ class SocialMediaVisualizer:
         x_col: str = 'avg_like_rate',
         y_col: str = 'avg_comment_rate',
         size_col: str = 'follower_count',
-        engine: str = 'plotly'
+        engine: str = 'plotly',
+        max_bubbles: Optional[int] = 2000
     ) -> None:
-        """Create bubble chart of user engagement metrics"""
+        """
+        Create bubble chart of user engagement metrics
+        Args:
+            max_bubbles: The plotly chart draws at most this many bubbles: the
+                largest users by size_col plus a random sample of the rest;
+                None draws every user
+        """
         if engine == 'matplotlib':
+            sizes = user_df[size_col].to_numpy(dtype=float, na_value=np.nan) * 0.1
+            colors = user_df['post_count'].to_numpy(dtype=float, na_value=np.nan)
+            
             plt.figure(figsize=(10, 8))
             plt.scatter(
-                user_df[x_col],
-                user_df[y_col],
-                s=user_df[size_col]/10,
+                user_df[x_col].to_numpy(dtype=float, na_value=np.nan),
+                user_df[y_col].to_numpy(dtype=float, na_value=np.nan),
+                s=sizes,
                 alpha=0.6,
-                c=user_df['post_count'],
+                c=colors,
                 cmap='viridis'
             )
             plt.colorbar(label='Post Count')
@@ -88,10 +371,11 @@ class SocialMediaVisualizer:
             plt.title('User Engagement Matrix')
             
             # Annotate top users
-            for _, row in user_df.nlargest(5, size_col).iterrows():
+            top = user_df.nlargest(5, size_col)[['username', x_col, y_col]].to_numpy()
+            for username, x, y in top:
                 plt.annotate(
-                    row['username'],
-                    (row[x_col], row[y_col]),
+                    username,
+                    (x, y),
                     textcoords="offset points",
                     xytext=(0,10),
                     ha='center'
@@ -102,8 +386,24 @@ class SocialMediaVisualizer:
             plt.show()
             
         elif engine == 'plotly':
+            if max_bubbles is not None and len(user_df) > max_bubbles:
+                # Keep every large account, plus a reproducible sample for density
+                top = user_df.nlargest(min(200, max_bubbles), size_col)
+                rest = user_df.drop(top.index).sample(
+                    max_bubbles - len(top), random_state=0
+                )
+                user_df = pd.concat([top, rest])
+            
+            # Sized by what is actually drawn; with the default cap this stays SVG
+            render_mode = 'webgl' if len(user_df) >= WEBGL_THRESHOLD else 'auto'
+            
+            columns = {
+                col: user_df[col].to_numpy(dtype=float, na_value=np.nan)
+                for col in dict.fromkeys([x_col, y_col, size_col, 'post_count'])
+            }
+            columns['username'] = user_df['username'].to_numpy(dtype=object)
             fig = px.scatter(
-                user_df,
+                columns,
                 x=x_col,
                 y=y_col,
                 size=size_col,
@@ -116,6 +416,7 @@ class SocialMediaVisualizer:
                     size_col: size_col.replace('_', ' ').title(),
                     'post_count': 'Post Count'
                 },
+                render_mode=render_mode,
                 template=self.plotly_template
             )
             fig.update_layout(
@@ -123,6 +424,38 @@ class SocialMediaVisualizer:
                 yaxis_title=y_col.replace('_', ' ').title()
             )
             fig.show()
+            
+        elif engine == 'datashader':
+            fig = self._plot_rasterized(
+                user_df[x_col],
+                user_df[y_col],
+                title='User Engagement Matrix',
+                x_title=x_col.replace('_', ' ').title(),
+                y_title=y_col.replace('_', ' ').title()
+            )
+            
+            # Hoverable bubbles only for the biggest users, drawn over the raster
+            top = user_df.nlargest(50, size_col)
+            sizes = top[size_col].to_numpy(dtype=float, na_value=np.nan)
+            fig.add_trace(go.Scatter(
+                x=top[x_col].to_numpy(dtype=float, na_value=np.nan),
+                y=top[y_col].to_numpy(dtype=float, na_value=np.nan),
+                mode='markers',
+                name=f"Top {len(top)} by {size_col.replace('_', ' ').title()}",
+                marker=dict(
+                    size=sizes,
+                    sizemode='area',
+                    sizeref=2.0 * max(sizes.max(initial=0), 1) / 40 ** 2,
+                    color=top['post_count'].to_numpy(dtype=float, na_value=np.nan),
+                    colorscale='Viridis',
+                    opacity=0.6,
+                    line=dict(width=1, color='white')
+                ),
+                text=top['username'].to_numpy(dtype=str),
+                customdata=top['post_count'].to_numpy(dtype=float, na_value=np.nan),
+                hovertemplate='%{text}<br>Post Count: %{customdata}<extra></extra>'
+            ))
+            fig.show()
     
     def plot_thread_depth_distribution(
         self,
@@ -130,9 +463,14 @@ class SocialMediaVisualizer:
         engine: str = 'plotly'
     ) -> None:
         """Visualize distribution of comment thread depths"""
+        # Depths are small non-negative ints, so count them with a bincount
+        counts = np.bincount(thread_df['max_thread_depth'].to_numpy(dtype=np.int32))
+        depths = np.nonzero(counts)[0]
+        depth_counts = pd.Series(counts[depths], index=depths)
+        
         if engine == 'matplotlib':
             plt.figure(figsize=(10, 6))
-            thread_df['max_thread_depth'].value_counts().sort_index().plot(
+            depth_counts.plot(
                 kind='bar',
                 color='skyblue',
                 edgecolor='black'
@@ -146,11 +484,9 @@ class SocialMediaVisualizer:
             plt.show()
             
         elif engine == 'plotly':
-            depth_counts = thread_df['max_thread_depth'].value_counts().sort_index()
             fig = px.bar(
-                depth_counts,
-                x=depth_counts.index,
-                y=depth_counts.values,
+                x=depths,
+                y=counts[depths],
                 title='Distribution of Comment Thread Depths',
                 labels={
                     'x': 'Thread Depth',
@@ -200,37 +536,38 @@ class SocialMediaVisualizer:
             plt.show()
             
         elif engine == 'plotly':
-            # Create nodes list
-            nodes = list(set(network_data['follower_username']).union(
-                set(network_data['followee_username'])
-            ))
+            # Node positions, and each edge's endpoints as node indices
+            layout = self._network_layout(network_data)
+            nodes = layout.index
+            xs, ys = layout['x'].to_numpy(), layout['y'].to_numpy()
+            node_index = pd.Series(np.arange(len(nodes)), index=nodes)
+            src = node_index.reindex(network_data['follower_username']).to_numpy()
+            dst = node_index.reindex(network_data['followee_username']).to_numpy()
             
-            # Create edges
-            edges = []
-            for _, row in network_data.iterrows():
-                edges.append((
-                    nodes.index(row['follower_username']),
-                    nodes.index(row['followee_username'])
-                ))
+            # Interleave (source, target, None) per edge so all edges form one line trace
+            edge_x = np.empty(3 * len(src), dtype=object)
+            edge_y = np.empty(3 * len(src), dtype=object)
+            edge_x[0::3], edge_x[1::3] = xs[src], xs[dst]
+            edge_y[0::3], edge_y[1::3] = ys[src], ys[dst]
             
             # Create network graph
+            Scatter = go.Scattergl if len(src) >= WEBGL_THRESHOLD else go.Scatter
             fig = go.Figure()
             
-            # Add edges
-            for edge in edges:
-                fig.add_trace(go.Scatter(
-                    x=[None],
-                    y=[None],
-                    mode='lines',
-                    line=dict(width=0.5, color='#888'),
-                    hoverinfo='none',
-                    showlegend=False
-                ))
+            # Add all edges as one trace
+            fig.add_trace(Scatter(
+                x=edge_x,
+                y=edge_y,
+                mode='lines',
+                line=dict(width=0.5, color='#888'),
+                hoverinfo='none',
+                showlegend=False
+            ))
             
             # Add nodes
-            fig.add_trace(go.Scatter(
-                x=[],  # Will be set in layout
-                y=[],  # Will be set in layout
+            fig.add_trace(Scatter(
+                x=xs,
+                y=ys,
                 mode='markers+text',
                 text=nodes,
                 marker=dict(
@@ -253,18 +590,6 @@ class SocialMediaVisualizer:
                 template=self.plotly_template
             )
             
-            # Create force-directed layout
-            fig.update_layout(
-                updatemenus=[dict(
-                    type="buttons",
-                    buttons=[dict(
-                        label="Animate",
-                        method="animate",
-                        args=[None]
-                    )]
-                )]
-            )
-            
             fig.show()
     def plot_activity_timeline(
         self,
@@ -273,13 +598,18 @@ class SocialMediaVisualizer:
         engine: str = 'plotly'
     ) -> None:
         """Visualize the timeline of activity for a post"""
+        if engine in ('matplotlib', 'plotly'):
+            # Split once by activity type; likes repeat per timestamp, so keep one each
+            groups = dict(tuple(timeline_df.groupby('activity_type', sort=False)))
+            comments = groups.get('comment', timeline_df.iloc[:0])
+            likes = groups.get('like', timeline_df.iloc[:0]).drop_duplicates('timestamp')
+        
         if engine == 'matplotlib':
             plt.figure(figsize=(12, 6))
             
             # Plot comments
-            comments = timeline_df[timeline_df['activity_type'] == 'comment']
             plt.scatter(
-                comments['timestamp'],
+                comments['timestamp'].to_numpy(dtype='datetime64[ns]'),
                 [1] * len(comments),
                 c='blue',
                 label='Comments',
@@ -287,12 +617,11 @@ class SocialMediaVisualizer:
             )
             
             # Plot likes
-            likes = timeline_df[timeline_df['activity_type'] == 'like'].drop_duplicates('timestamp')
             plt.scatter(
-                likes['timestamp'],
+                likes['timestamp'].to_numpy(dtype='datetime64[ns]'),
                 [0.5] * len(likes),
                 c='green',
-                s=likes['like_count'] * 10,
+                s=likes['like_count'].to_numpy(dtype=float) * 10,
                 label='Likes',
                 alpha=0.5
             )
@@ -306,13 +635,17 @@ class SocialMediaVisualizer:
             plt.show()
             
         elif engine == 'plotly':
+            Scatter = go.Scattergl if len(timeline_df) >= WEBGL_THRESHOLD else go.Scatter
             fig = go.Figure()
             
             # Add comments
-            comments = timeline_df[timeline_df['activity_type'] == 'comment']
-            fig.add_trace(go.Scatter(
-                x=comments['timestamp'],
-                y=['Comment'] * len(comments),
+            hover_text = np.char.add(
+                np.char.add(comments['username'].to_numpy(dtype=str), ': '),
+                comments['content'].str[:50].to_numpy(dtype=str)
+            )
+            fig.add_trace(Scatter(
+                x=comments['timestamp'].to_numpy(dtype='datetime64[ns]'),
+                y=np.ones(len(comments), dtype=np.int8),
                 mode='markers',
                 name='Comments',
                 marker=dict(
@@ -320,24 +653,24 @@ class SocialMediaVisualizer:
                     size=8,
                     opacity=0.7
                 ),
-                text=comments['username'] + ': ' + comments['content'].str.slice(0, 50),
+                text=hover_text,
                 hoverinfo='text'
             ))
             
-            # Add likes
-            likes = timeline_df[timeline_df['activity_type'] == 'like'].drop_duplicates('timestamp')
-            fig.add_trace(go.Scatter(
-                x=likes['timestamp'],
-                y=['Like'] * len(likes),
+            # Add likes; hover reads the count from customdata
+            like_counts = likes['like_count'].to_numpy(dtype=int)
+            fig.add_trace(Scatter(
+                x=likes['timestamp'].to_numpy(dtype='datetime64[ns]'),
+                y=np.zeros(len(likes), dtype=np.int8),
                 mode='markers',
                 name='Likes',
                 marker=dict(
                     color='green',
-                    size=likes['like_count'] * 5,
+                    size=like_counts * 5,
                     opacity=0.5
                 ),
-                text=likes['username'] + ' liked this post',
-                hoverinfo='text'
+                customdata=like_counts,
+                hovertemplate='%{customdata} likes<extra></extra>'
             ))
             
             fig.update_layout(
@@ -347,6 +680,20 @@ class SocialMediaVisualizer:
                 hovermode='closest',
                 template=self.plotly_template
             )
+            # Numeric lanes, labelled once via ticks instead of a string per point
+            fig.update_yaxes(tickvals=[0, 1], ticktext=['Likes', 'Comments'], range=[-0.5, 1.5])
+            fig.show()
+            
+        elif engine == 'datashader':
+            lane = (timeline_df['activity_type'] == 'comment').astype(float)
+            fig = self._plot_rasterized(
+                timeline_df['timestamp'],
+                lane,
+                title=title,
+                x_title='Time',
+                y_title='Activity Type'
+            )
+            fig.update_yaxes(tickvals=[0, 1], ticktext=['Likes', 'Comments'])
             fig.show()
 
     def plot_controversial_posts(
@@ -371,24 +718,28 @@ class SocialMediaVisualizer:
             plt.show()
             
         elif engine == 'plotly':
-            fig = px.bar(
-                controversial_df,
-                x='post_id',
-                y=['total_comments', 'unique_commenters', 'controversy_score'],
-                title='Controversial Posts Metrics',
-                labels={
-                    'post_id': 'Post ID',
-                    'value': 'Count/Score',
-                    'variable': 'Metric'
-                },
-                barmode='group',
-                template=self.plotly_template
+            long_df = controversial_df.melt(
+                id_vars='post_id',
+                value_vars=['total_comments', 'unique_commenters', 'controversy_score'],
+                var_name='metric',
+                value_name='value'
             )
+            fig = go.Figure([
+                go.Bar(
+                    name=metric,
+                    x=group['post_id'].to_numpy(),
+                    y=group['value'].to_numpy()
+                )
+                for metric, group in long_df.groupby('metric', sort=False)
+            ])
             
             fig.update_layout(
+                title='Controversial Posts Metrics',
                 xaxis_title='Post ID',
                 yaxis_title='Count/Score',
                 legend_title='Metric',
-                hovermode='x unified'
+                barmode='group',
+                hovermode='x unified',
+                template=self.plotly_template
             )
-            fig.show()    
\ No newline at end of file
+            fig.show()
\ No newline at end of file
@@ -1,17 +1,20 @@
 import os
+from functools import cached_property
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class Config:
-    DB_ENGINE = os.getenv('DB_ENGINE', 'postgresql')
-    DB_USER = os.getenv('DB_USER', 'postgres')
-    DB_PASSWORD = os.getenv('DB_PASSWORD', '')
-    DB_HOST = os.getenv('DB_HOST', 'localhost')
-    DB_PORT = os.getenv('DB_PORT', '5432')
-    DB_NAME = os.getenv('DB_NAME', 'social_media_analytics')
+    def __init__(self):
+        # Read the environment when the config is created, not at import time
+        self.DB_ENGINE = os.getenv('DB_ENGINE', 'postgresql')
+        self.DB_USER = os.getenv('DB_USER', 'postgres')
+        self.DB_PASSWORD = os.getenv('DB_PASSWORD', '')
+        self.DB_HOST = os.getenv('DB_HOST', 'localhost')
+        self.DB_PORT = os.getenv('DB_PORT', '5432')
+        self.DB_NAME = os.getenv('DB_NAME', 'social_media_analytics')
     
-    @property
+    @cached_property
     def DATABASE_URI(self):
         return f"{self.DB_ENGINE}://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
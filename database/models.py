@@ -1,6 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, 
-    ForeignKey, CheckConstraint, UniqueConstraint
+    Column, Integer, BigInteger, String, Text, DateTime, Boolean, 
+    ForeignKey, CheckConstraint, Computed, Index, text
 )
 from sqlalchemy.orm import relationship, backref
 from sqlalchemy.ext.declarative import declarative_base
@@ -36,6 +36,7 @@ class Post(Base):
     post_id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     post_text = Column(Text)
+    post_preview = Column(String(50), Computed('SUBSTRING(post_text, 1, 50)', persisted=True))
     media_url = Column(String(255))
     post_time = Column(DateTime, default=datetime.utcnow)
     is_public = Column(Boolean, default=True)
@@ -65,6 +66,18 @@ class Comment(Base):
         uselist=False
     )
 
+class CommentDepth(Base):
+    __tablename__ = 'comment_depth'
+    
+    comment_id = Column(
+        Integer, 
+        ForeignKey('comments.comment_id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    post_id = Column(Integer, ForeignKey('posts.post_id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    depth = Column(Integer, nullable=False)
+
 class Like(Base):
     __tablename__ = 'likes'
     
@@ -86,8 +99,52 @@ class Like(Base):
             '(post_id IS NULL AND comment_id IS NOT NULL)',
             name='chk_like_target'
         ),
-        UniqueConstraint('user_id', 'post_id', 'comment_id', name='unq_like')
+        # One like per user per target; partial so NULL target slots aren't indexed
+        Index(
+            'unq_like_post', 'user_id', 'post_id',
+            unique=True,
+            postgresql_where=text('post_id IS NOT NULL')
+        ),
+        Index(
+            'unq_like_comment', 'user_id', 'comment_id',
+            unique=True,
+            postgresql_where=text('comment_id IS NOT NULL')
+        )
+    )
+
+class PostEngagementStats(Base):
+    __tablename__ = 'post_engagement_stats'
+    
+    post_id = Column(
+        Integer, 
+        ForeignKey('posts.post_id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    like_count = Column(Integer, nullable=False, default=0)
+    comment_count = Column(Integer, nullable=False, default=0)
+    last_updated = Column(DateTime, default=datetime.utcnow)
+
+class CommentLengthStats(Base):
+    __tablename__ = 'comment_length_stats'
+    
+    post_id = Column(
+        Integer, 
+        ForeignKey('posts.post_id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    n = Column(BigInteger, nullable=False, default=0)
+    sum_len = Column(BigInteger, nullable=False, default=0)
+    sum_len_sq = Column(BigInteger, nullable=False, default=0)
+
+class UserFollowerCount(Base):
+    __tablename__ = 'user_follower_count'
+    
+    user_id = Column(
+        Integer, 
+        ForeignKey('users.user_id', ondelete='CASCADE'), 
+        primary_key=True
     )
+    follower_count = Column(Integer, nullable=False, default=0)
 
 class Follow(Base):
     __tablename__ = 'follows'
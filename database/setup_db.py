@@ -15,23 +15,233 @@ def setup_database():
         # Create tables
         Base.metadata.create_all(engine)
         
-        # Add indexes
-        with engine.connect() as conn:
-            index_queries = [
+        # All DDL below runs in one transaction, committed on exit
+        with engine.begin() as conn:
+            # Columns added after tables were first created
+            conn.execute(text(
+                "ALTER TABLE posts ADD COLUMN IF NOT EXISTS post_preview VARCHAR(50) "
+                "GENERATED ALWAYS AS (SUBSTRING(post_text, 1, 50)) STORED"
+            ))
+            
+            # Replaced by the partial unique indexes unq_like_post/unq_like_comment
+            conn.execute(text("ALTER TABLE likes DROP CONSTRAINT IF EXISTS unq_like"))
+            
+            # Drop indexes that were redefined under a new name, or whose
+            # leading column is covered by a composite index below
+            drop_index_queries = [
+                "DROP INDEX IF EXISTS idx_comments_parent",
+                "DROP INDEX IF EXISTS idx_likes_post_time",
+                "DROP INDEX IF EXISTS idx_comments_post",
+                "DROP INDEX IF EXISTS idx_likes_post",
+                "DROP INDEX IF EXISTS idx_follows_followee"
+            ]
+            
+            # Add indexes
+            index_queries = drop_index_queries + [
                 "CREATE INDEX IF NOT EXISTS idx_posts_user ON posts(user_id)",
-                "CREATE INDEX IF NOT EXISTS idx_comments_post ON comments(post_id)",
-                "CREATE INDEX IF NOT EXISTS idx_comments_parent ON comments(parent_comment_id)",
-                "CREATE INDEX IF NOT EXISTS idx_likes_post ON likes(post_id)",
+                "CREATE INDEX IF NOT EXISTS idx_comments_parent_covering ON comments(parent_comment_id) INCLUDE (comment_id, post_id, user_id)",
+                "CREATE INDEX IF NOT EXISTS idx_comments_post_user ON comments(post_id, user_id)",
+                "CREATE INDEX IF NOT EXISTS idx_comments_post_time ON comments(post_id, comment_time)",
                 "CREATE INDEX IF NOT EXISTS idx_likes_comment ON likes(comment_id)",
                 "CREATE INDEX IF NOT EXISTS idx_likes_user ON likes(user_id)",
+                "CREATE INDEX IF NOT EXISTS idx_likes_post_time_partial ON likes(post_id, like_time) WHERE post_id IS NOT NULL",
+                "CREATE INDEX IF NOT EXISTS idx_likes_post_user ON likes(post_id, user_id)",
+                "CREATE UNIQUE INDEX IF NOT EXISTS unq_like_post ON likes(user_id, post_id) WHERE post_id IS NOT NULL",
+                "CREATE UNIQUE INDEX IF NOT EXISTS unq_like_comment ON likes(user_id, comment_id) WHERE comment_id IS NOT NULL",
                 "CREATE INDEX IF NOT EXISTS idx_follows_follower ON follows(follower_id)",
-                "CREATE INDEX IF NOT EXISTS idx_follows_followee ON follows(followee_id)"
+                "CREATE INDEX IF NOT EXISTS idx_follows_followee_time ON follows(followee_id, follow_time)",
+                "CREATE INDEX IF NOT EXISTS idx_comment_depth_post ON comment_depth(post_id, depth)",
+                # Let the analytics cache watermark read each MAX(*_time) from an index
+                "CREATE INDEX IF NOT EXISTS idx_posts_time ON posts(post_time)",
+                "CREATE INDEX IF NOT EXISTS idx_comments_time ON comments(comment_time)",
+                "CREATE INDEX IF NOT EXISTS idx_likes_time ON likes(like_time)",
+                "CREATE INDEX IF NOT EXISTS idx_follows_time ON follows(follow_time)"
             ]
             
-            for query in index_queries:
+            # Plain DDL without bind markers; send it as one multi-statement round-trip
+            conn.execute(text(";\n".join(index_queries)))
+            
+            # Maintain denormalised tables at write time instead of
+            # recursing/aggregating on read
+            trigger_queries = [
+                """
+                CREATE OR REPLACE FUNCTION set_comment_depth() RETURNS TRIGGER AS $$
+                DECLARE
+                    parent_depth INTEGER := 0;
+                BEGIN
+                    IF NEW.parent_comment_id IS NOT NULL THEN
+                        SELECT depth INTO parent_depth FROM comment_depth 
+                        WHERE comment_id = NEW.parent_comment_id;
+                        
+                        -- A missing parent row means comment_depth is out of sync;
+                        -- fail loudly rather than record the reply as top-level
+                        IF NOT FOUND THEN
+                            RAISE EXCEPTION 
+                                'comment_depth has no row for parent comment % of comment % (truncate comment_depth and rerun setup_database to rebuild it)',
+                                NEW.parent_comment_id, NEW.comment_id;
+                        END IF;
+                    END IF;
+                    
+                    INSERT INTO comment_depth (comment_id, post_id, user_id, depth)
+                    VALUES (NEW.comment_id, NEW.post_id, NEW.user_id, parent_depth + 1);
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE OR REPLACE TRIGGER trg_comment_depth
+                AFTER INSERT ON comments
+                FOR EACH ROW EXECUTE FUNCTION set_comment_depth()
+                """,
+                """
+                CREATE OR REPLACE FUNCTION update_post_engagement_stats() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        IF NEW.post_id IS NULL THEN
+                            RETURN NULL;
+                        END IF;
+                        INSERT INTO post_engagement_stats 
+                            (post_id, like_count, comment_count, last_updated)
+                        VALUES (
+                            NEW.post_id,
+                            CASE WHEN TG_TABLE_NAME = 'likes' THEN 1 ELSE 0 END,
+                            CASE WHEN TG_TABLE_NAME = 'comments' THEN 1 ELSE 0 END,
+                            NOW()
+                        )
+                        ON CONFLICT (post_id) DO UPDATE SET
+                            like_count = post_engagement_stats.like_count + EXCLUDED.like_count,
+                            comment_count = post_engagement_stats.comment_count + EXCLUDED.comment_count,
+                            last_updated = EXCLUDED.last_updated;
+                    ELSE
+                        UPDATE post_engagement_stats SET
+                            like_count = like_count - CASE WHEN TG_TABLE_NAME = 'likes' THEN 1 ELSE 0 END,
+                            comment_count = comment_count - CASE WHEN TG_TABLE_NAME = 'comments' THEN 1 ELSE 0 END,
+                            last_updated = NOW()
+                        WHERE post_id = OLD.post_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE OR REPLACE TRIGGER trg_likes_post_stats
+                AFTER INSERT OR DELETE ON likes
+                FOR EACH ROW EXECUTE FUNCTION update_post_engagement_stats()
+                """,
+                """
+                CREATE OR REPLACE TRIGGER trg_comments_post_stats
+                AFTER INSERT OR DELETE ON comments
+                FOR EACH ROW EXECUTE FUNCTION update_post_engagement_stats()
+                """,
+                """
+                CREATE OR REPLACE FUNCTION update_comment_length_stats() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        INSERT INTO comment_length_stats (post_id, n, sum_len, sum_len_sq)
+                        VALUES (
+                            NEW.post_id,
+                            1,
+                            LENGTH(NEW.comment_text),
+                            CAST(LENGTH(NEW.comment_text) AS BIGINT) * LENGTH(NEW.comment_text)
+                        )
+                        ON CONFLICT (post_id) DO UPDATE SET
+                            n = comment_length_stats.n + 1,
+                            sum_len = comment_length_stats.sum_len + EXCLUDED.sum_len,
+                            sum_len_sq = comment_length_stats.sum_len_sq + EXCLUDED.sum_len_sq;
+                    ELSE
+                        UPDATE comment_length_stats SET
+                            n = n - 1,
+                            sum_len = sum_len - LENGTH(OLD.comment_text),
+                            sum_len_sq = sum_len_sq 
+                                - CAST(LENGTH(OLD.comment_text) AS BIGINT) * LENGTH(OLD.comment_text)
+                        WHERE post_id = OLD.post_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE OR REPLACE TRIGGER trg_comments_length_stats
+                AFTER INSERT OR DELETE ON comments
+                FOR EACH ROW EXECUTE FUNCTION update_comment_length_stats()
+                """,
+                """
+                CREATE OR REPLACE FUNCTION update_user_follower_count() RETURNS TRIGGER AS $$
+                BEGIN
+                    IF TG_OP = 'INSERT' THEN
+                        INSERT INTO user_follower_count (user_id, follower_count)
+                        VALUES (NEW.followee_id, 1)
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            follower_count = user_follower_count.follower_count + 1;
+                    ELSE
+                        UPDATE user_follower_count SET follower_count = follower_count - 1
+                        WHERE user_id = OLD.followee_id;
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+                """,
+                """
+                CREATE OR REPLACE TRIGGER trg_follows_follower_count
+                AFTER INSERT OR DELETE ON follows
+                FOR EACH ROW EXECUTE FUNCTION update_user_follower_count()
+                """
+            ]
+            
+            for query in trigger_queries:
                 conn.execute(text(query))
             
-            conn.commit()
+            # Fill each denormalised table from existing rows once, when it is
+            # still empty (just created, or created before its trigger existed);
+            # afterwards the triggers keep it current
+            backfill_queries = {
+                'comment_depth': """
+                    WITH RECURSIVE comment_threads AS (
+                        SELECT comment_id, post_id, user_id, 1 AS depth
+                        FROM comments
+                        WHERE parent_comment_id IS NULL
+                    
+                        UNION ALL
+                    
+                        SELECT c.comment_id, c.post_id, c.user_id, ct.depth + 1
+                        FROM comments c
+                        JOIN comment_threads ct ON c.parent_comment_id = ct.comment_id
+                    )
+                    INSERT INTO comment_depth (comment_id, post_id, user_id, depth)
+                    SELECT comment_id, post_id, user_id, depth FROM comment_threads
+                    ON CONFLICT (comment_id) DO NOTHING
+                    """,
+                'post_engagement_stats': """
+                    INSERT INTO post_engagement_stats (post_id, like_count, comment_count, last_updated)
+                    SELECT 
+                        p.post_id,
+                        (SELECT COUNT(*) FROM likes l WHERE l.post_id = p.post_id),
+                        (SELECT COUNT(*) FROM comments c WHERE c.post_id = p.post_id),
+                        NOW()
+                    FROM posts p
+                    ON CONFLICT (post_id) DO NOTHING
+                    """,
+                'comment_length_stats': """
+                    INSERT INTO comment_length_stats (post_id, n, sum_len, sum_len_sq)
+                    SELECT 
+                        post_id,
+                        COUNT(*),
+                        SUM(LENGTH(comment_text)),
+                        SUM(CAST(LENGTH(comment_text) AS BIGINT) * LENGTH(comment_text))
+                    FROM comments
+                    GROUP BY post_id
+                    ON CONFLICT (post_id) DO NOTHING
+                    """,
+                'user_follower_count': """
+                    INSERT INTO user_follower_count (user_id, follower_count)
+                    SELECT followee_id, COUNT(*) FROM follows GROUP BY followee_id
+                    ON CONFLICT (user_id) DO NOTHING
+                    """
+            }
+            
+            for table, query in backfill_queries.items():
+                if conn.execute(text(f"SELECT NOT EXISTS (SELECT 1 FROM {table})")).scalar():
+                    conn.execute(text(query))
         
         print("Database setup completed successfully")
         return engine
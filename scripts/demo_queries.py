@@ -1,6 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from database.setup_db import setup_database
+from analytics._parallel import run_calls_in_parallel
 from analytics.engagement import EngagementAnalyzer
 from analytics.network import NetworkAnalyzer
 from analytics.content import ContentAnalyzer
@@ -12,17 +13,29 @@ def main():
     session = Session()
     
     try:
+        analyzers = {
+            'engagement': EngagementAnalyzer(session),
+            'network': NetworkAnalyzer(session),
+            'content': ContentAnalyzer(session)
+        }
+        
+        # Warm the query cache with every report's queries concurrently; the
+        # report steps below ask for the same calls and read them from the cache
+        run_calls_in_parallel({
+            f'{name}.{query}': (analyzer, method_name, args)
+            for name, analyzer in analyzers.items()
+            for query, (method_name, args) in analyzer.report_queries().items()
+        })
+        
+        # Reports and plots stay on the main thread, in order: pyplot is not thread-safe
         print("=== Running Engagement Analysis ===")
-        engagement_analyzer = EngagementAnalyzer(session)
-        engagement_analyzer.analyze_and_visualize_engagement()
+        analyzers['engagement'].analyze_and_visualize_engagement()
         
         print("\n=== Running Network Analysis ===")
-        network_analyzer = NetworkAnalyzer(session)
-        network_analyzer.analyze_and_visualize_network()
+        analyzers['network'].analyze_and_visualize_network()
         
         print("\n=== Running Content Analysis ===")
-        content_analyzer = ContentAnalyzer(session)
-        content_analyzer.analyze_and_visualize_content()
+        analyzers['content'].analyze_and_visualize_content()
         
     finally:
         session.close()
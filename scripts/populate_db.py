@@ -1,8 +1,59 @@
+import csv
+import io
+from sqlalchemy import insert
 from sqlalchemy.orm import sessionmaker
 from database.models import User, Post, Comment, Like, Follow
 from database.setup_db import setup_database
 from datetime import datetime, timedelta
 import random
+import numpy as np
+
+def _copy_rows(session, model, rows):
+    """Stream rows into the model's table with COPY FROM STDIN (PostgreSQL only)"""
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+
+    # Raw DBAPI cursor on the session's connection, so COPY joins its transaction
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {model.__tablename__} ({', '.join(columns)}) FROM STDIN WITH CSV",
+            buffer
+        )
+    finally:
+        cursor.close()
+
+def _insert_rows(session, model, rows, pk=None):
+    """
+    Bulk insert rows into the model's table
+    Args:
+        session: Session whose transaction the insert joins
+        model: Mapped class to insert into
+        rows: List of column -> value dicts, all with the same keys
+        pk: Primary key column to return, in input order
+    Returns:
+        List of primary keys if pk is given, else None
+    """
+    if not rows:
+        return [] if pk is not None else None
+
+    if pk is not None:
+        # insertmanyvalues batches this and guarantees keys in input order
+        result = session.execute(
+            insert(model).returning(pk, sort_by_parameter_order=True),
+            rows
+        )
+        return result.scalars().all()
+
+    if session.get_bind().dialect.name == 'postgresql':
+        _copy_rows(session, model, rows)
+    else:
+        session.execute(insert(model), rows)
+    return None
 
 def populate_sample_data():
     engine = setup_database()
@@ -17,87 +68,101 @@ def populate_sample_data():
         session.query(Follow).delete()
         session.query(User).delete()
         
+        # COPY bypasses the models' Python-side defaults, so rows carry them explicitly
+        now = datetime.utcnow()
+        
         # Create users
-        users = [
-            User(username='alice_smith', full_name='Alice Smith', email='alice@example.com'),
-            User(username='bob_jones', full_name='Bob Jones', email='bob@example.com'),
-            User(username='charlie_brown', full_name='Charlie Brown', email='charlie@example.com'),
-            User(username='diana_ross', full_name='Diana Ross', email='diana@example.com'),
-            User(username='evan_garcia', full_name='Evan Garcia', email='evan@example.com')
+        user_defaults = dict(join_date=now, is_active=True)
+        user_rows = [
+            dict(username='alice_smith', full_name='Alice Smith', email='alice@example.com', **user_defaults),
+            dict(username='bob_jones', full_name='Bob Jones', email='bob@example.com', **user_defaults),
+            dict(username='charlie_brown', full_name='Charlie Brown', email='charlie@example.com', **user_defaults),
+            dict(username='diana_ross', full_name='Diana Ross', email='diana@example.com', **user_defaults),
+            dict(username='evan_garcia', full_name='Evan Garcia', email='evan@example.com', **user_defaults)
         ]
-        session.add_all(users)
-        session.commit()
+        user_ids = _insert_rows(session, User, user_rows, User.user_id)
         
         # Create posts with varying dates
-        posts = []
-        for i, user in enumerate(users):
+        post_rows = []
+        for user_id, user in zip(user_ids, user_rows):
             for j in range(1, 4):  # 3 posts per user
                 post_time = datetime.utcnow() - timedelta(days=random.randint(0, 30))
-                posts.append(
-                    Post(
-                        user_id=user.user_id,
-                        post_text=f"Sample post {j} from {user.username}",
-                        post_time=post_time
-                    )
-                )
-        session.add_all(posts)
-        session.commit()
+                post_rows.append(dict(
+                    user_id=user_id,
+                    post_text=f"Sample post {j} from {user['username']}",
+                    post_time=post_time,
+                    is_public=True
+                ))
+        post_ids = _insert_rows(session, Post, post_rows, Post.post_id)
         
-        # Create follows
-        follows = [
-            Follow(follower_id=users[1].user_id, followee_id=users[0].user_id),
-            Follow(follower_id=users[2].user_id, followee_id=users[0].user_id),
-            Follow(follower_id=users[3].user_id, followee_id=users[0].user_id),
-            Follow(follower_id=users[4].user_id, followee_id=users[0].user_id),
-            Follow(follower_id=users[0].user_id, followee_id=users[1].user_id),
-            Follow(follower_id=users[2].user_id, followee_id=users[1].user_id),
-            Follow(follower_id=users[0].user_id, followee_id=users[2].user_id),
-            Follow(follower_id=users[1].user_id, followee_id=users[2].user_id),
-            Follow(follower_id=users[3].user_id, followee_id=users[2].user_id),
-            Follow(follower_id=users[0].user_id, followee_id=users[4].user_id)
+        # Create follows (follower index, followee index)
+        follow_pairs = [
+            (1, 0), (2, 0), (3, 0), (4, 0),
+            (0, 1), (2, 1),
+            (0, 2), (1, 2), (3, 2),
+            (0, 4)
         ]
-        session.add_all(follows)
-        session.commit()
+        _insert_rows(session, Follow, [
+            dict(
+                follower_id=user_ids[follower],
+                followee_id=user_ids[followee],
+                follow_time=now
+            )
+            for follower, followee in follow_pairs
+        ])
         
-        # Create comments with hierarchy
-        comments = []
-        for post in posts[:5]:  # Add comments to first 5 posts
-            for i in range(3):  # 3 top-level comments per post
-                comment = Comment(
-                    post_id=post.post_id,
-                    user_id=random.choice(users).user_id,
-                    comment_text=f"Comment {i+1} on post {post.post_id}"
-                )
-                comments.append(comment)
-                session.add(comment)
-                session.flush()  # Get the comment_id
-                
-                # Add 1-2 replies to each comment
-                for j in range(random.randint(1, 2)):
-                    reply = Comment(
-                        post_id=post.post_id,
-                        user_id=random.choice(users).user_id,
-                        parent_comment_id=comment.comment_id,
-                        comment_text=f"Reply {j+1} to comment {comment.comment_id}"
-                    )
-                    comments.append(reply)
-        session.add_all(comments)
-        session.commit()
+        # Draw every random user choice up front as NumPy arrays; .tolist()
+        # hands the driver plain ints
+        rng = np.random.default_rng()
+        user_id_array = np.array(user_ids)
         
-        # Create likes
-        likes = []
-        for post in posts:
-            likers = random.sample(users, random.randint(1, len(users)))
-            for user in likers:
-                likes.append(
-                    Like(
-                        post_id=post.post_id,
-                        user_id=user.user_id
-                    )
-                )
-        session.add_all(likes)
-        session.commit()
+        # Create comments with hierarchy: top-level comments first so
+        # replies can reference their returned IDs
+        commented_posts = post_ids[:5]  # Add comments to first 5 posts
+        comments_per_post = 3  # 3 top-level comments per post
+        commenters = rng.choice(
+            user_id_array, size=len(commented_posts) * comments_per_post
+        ).tolist()
+        top_level_rows = []
+        for p, post_id in enumerate(commented_posts):
+            for i in range(comments_per_post):
+                top_level_rows.append(dict(
+                    post_id=post_id,
+                    user_id=commenters[p * comments_per_post + i],
+                    comment_text=f"Comment {i+1} on post {post_id}",
+                    comment_time=now
+                ))
+        comment_ids = _insert_rows(session, Comment, top_level_rows, Comment.comment_id)
         
+        # Add 1-2 replies to each comment
+        reply_counts = rng.integers(1, 3, size=len(comment_ids)).tolist()
+        repliers = iter(rng.choice(user_id_array, size=sum(reply_counts)).tolist())
+        reply_rows = []
+        for comment_id, comment, num_replies in zip(comment_ids, top_level_rows, reply_counts):
+            for j in range(num_replies):
+                reply_rows.append(dict(
+                    post_id=comment['post_id'],
+                    user_id=next(repliers),
+                    parent_comment_id=comment_id,
+                    comment_text=f"Reply {j+1} to comment {comment_id}",
+                    comment_time=now
+                ))
+        _insert_rows(session, Comment, reply_rows)
+        
+        # Create likes: each post gets k ~ U[1, num_users] distinct likers,
+        # those whose slot in a random per-post permutation is below k
+        like_counts = rng.integers(1, len(user_ids) + 1, size=len(post_ids))
+        ranks = rng.random((len(post_ids), len(user_ids))).argsort(axis=1)
+        post_idx, user_idx = np.nonzero(ranks < like_counts[:, None])
+        like_post_ids = np.array(post_ids)[post_idx].tolist()
+        like_user_ids = user_id_array[user_idx].tolist()
+        like_rows = [
+            dict(post_id=post_id, user_id=user_id, like_time=now)
+            for post_id, user_id in zip(like_post_ids, like_user_ids)
+        ]
+        _insert_rows(session, Like, like_rows)
+        
+        session.commit()
         print("Sample data populated successfully")
         
     except Exception as e: